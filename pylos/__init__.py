@@ -0,0 +1,10 @@
+"""Pylos game engine.  Importing the package does not read the outcome table;
+it is loaded from disk on the first lookup"""
+from pylos.oc_table import OCTable, oc_dict, set_oc_path, save_oc_dict
+from pylos.state import (
+  N, COUNT, B, R, E, CP, CN, CR, CL,
+  State, get_reserve_configs, sweep_reserves,
+)
+from pylos.play import (
+  get_ranked_moves, get_best_moves, get_best_move, get_principal_line,
+)
@@ -0,0 +1,206 @@
+"""Streaming statistics over a solved outcome table.
+
+The JSON file is read in fixed-size chunks and each chunk of keys is decoded into NumPy arrays,
+so memory use depends on the chunk size and the number of distinct groups, not the table size.
+Run as `python -m pylos.analytics [path] [chunk_size]`"""
+import re
+import sys
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from pylos.oc_table import DEFAULT_OC_PATH
+from pylos.state import N, COUNT, B, R, CP, CN, CR, CL
+
+
+OCS = [CP, CN, CL, CR]
+OC_INDEX = {oc: ii for ii, oc in enumerate(OCS)}
+UID_LEN = sum([(layer+1)*(layer+1) for layer in range(N)]) + N - 1
+ENTRY_RE = re.compile(r'"([^"]+)"\s*:\s*"([^"]+)"')
+
+
+def _get_cell_layout():
+  """Return the flat cell index of every (layer, row, col) in encode() order and the uid
+  column of every cell (uids separate layers with '-')"""
+  flat = {}
+  columns = []
+  pos = 0
+  for layer in range(N):
+    for row in range(layer+1):
+      for col in range(layer+1):
+        flat[(layer, row, col)] = len(columns)
+        columns.append(pos)
+        pos += 1
+    pos += 1 # skip '-'
+  return flat, np.array(columns)
+
+
+def _get_symmetries(flat):
+  """Return index arrays for the 7 non-identity rotations/mirrors used by State.get_equivalence"""
+  maps = [
+    lambda l, r, c: (c, r),
+    lambda l, r, c: (l-r, c),
+    lambda l, r, c: (c, l-r),
+    lambda l, r, c: (l-r, l-c),
+    lambda l, r, c: (l-c, l-r),
+    lambda l, r, c: (r, l-c),
+    lambda l, r, c: (l-c, r),
+  ]
+  perms = []
+  for fn in maps:
+    perm = np.empty(len(flat), dtype=np.intp)
+    for (layer, row, col), idx in flat.items():
+      perm[idx] = flat[(layer,) + fn(layer, row, col)]
+    perms.append(perm)
+  return perms
+
+
+CELL_INDEX, CELL_COLUMNS = _get_cell_layout()
+SYMMETRIES = _get_symmetries(CELL_INDEX)
+LAYER_SLICES = [
+  slice(CELL_INDEX[(layer, 0, 0)], CELL_INDEX[(layer, layer, layer)] + 1) for layer in range(N)
+]
+CHAR_CODES = np.zeros(256, dtype=np.int8)
+CHAR_CODES[ord(B)] = 1
+CHAR_CODES[ord(R)] = 2
+OC_CODES = np.full(256, -1, dtype=np.int8) # indexed by the second letter of an outcome class
+for _oc in OCS:
+  OC_CODES[ord(_oc[1])] = OC_INDEX[_oc]
+
+
+def iter_oc_chunks(path=DEFAULT_OC_PATH, chunk_size=1 << 22):
+  """Yield (keys, ocs) lists read from the JSON table chunk_size characters at a time"""
+  tail = ""
+  with open(path) as f:
+    while True:
+      text = f.read(chunk_size)
+      buf = tail + text
+      entries = ENTRY_RE.findall(buf)
+      if entries:
+        keys, ocs = zip(*entries)
+        yield list(keys), list(ocs)
+      if not text:
+        return
+      if entries:
+        # Keys are unique, so the last key locates the end of the last complete entry
+        key, oc = entries[-1]
+        end = buf.rfind(f'"{key}"')
+        end = buf.index(f'"{oc}"', end + len(key) + 2) + len(oc) + 2
+        tail = buf[end:]
+      else:
+        tail = buf
+
+
+def decode_keys(keys):
+  """Decode oc_dict keys in bulk.  Return (valid, cells, reserves):
+  valid masks the keys whose board has the size of N (tables may hold entries from smaller N),
+  cells is a (valid count, cell count) int8 array with 0=E, 1=B, 2=R in encode() order,
+  reserves is a (valid count, 2) array of the remaining blue and red marbles"""
+  keys = np.array(keys)
+  heads, seps, rests = np.char.partition(keys, ':').T
+  valid = np.char.str_len(heads) == UID_LEN
+  heads, seps, rests = heads[valid], seps[valid], rests[valid]
+  raw = np.array(heads, dtype=f'S{UID_LEN}').view(np.uint8).reshape(-1, UID_LEN)
+  cells = CHAR_CODES[raw[:, CELL_COLUMNS]]
+
+  # Plain uids use the default reserves; uid:blue:red keys carry their own
+  reserves = np.stack([COUNT - (cells == 1).sum(axis=1), COUNT - (cells == 2).sum(axis=1)], axis=1)
+  has_reserves = seps == ':'
+  if has_reserves.any():
+    blue, _, red = np.char.partition(rests[has_reserves], ':').T
+    reserves[has_reserves, 0] = blue.astype(int)
+    reserves[has_reserves, 1] = red.astype(int)
+  return valid, cells, reserves
+
+
+def _count_groups(counts, groups, oc_codes):
+  """Add the (group, oc) pair counts of one chunk into counts[group][oc]"""
+  pairs, freq = np.unique(np.column_stack([groups, oc_codes]), axis=0, return_counts=True)
+  for (group, oc_code), nn in zip(pairs.tolist(), freq.tolist()):
+    counts[group][OCS[oc_code]] += nn
+
+
+def analyze(path=DEFAULT_OC_PATH, chunk_size=1 << 22):
+  """Stream the table at path and return a report dict.
+  Each breakdown maps a group value to a Counter of outcome classes"""
+  report = {
+    'total': Counter(),
+    'by_marbles': defaultdict(Counter),
+    'by_reserve_diff': defaultdict(Counter),
+    'by_layer_occupancy': defaultdict(Counter),
+    'symmetric': Counter(),
+    'symmetry_classes': 0.0,
+    'skipped': 0,
+    'unknown_oc': 0,
+  }
+  occupancy_radix = np.array([(layer+1)*(layer+1) + 1 for layer in range(N)])
+  occupancy_weights = np.concatenate([[1], np.cumprod(occupancy_radix[:-1])])
+
+  for keys, ocs in iter_oc_chunks(path, chunk_size):
+    valid, cells, reserves = decode_keys(keys)
+    report['skipped'] += int((~valid).sum())
+
+    # Outcome classes are two letters starting with C; anything else is counted and dropped
+    raw = np.array(ocs, dtype='S3').view(np.uint8).reshape(-1, 3)[valid]
+    oc_codes = np.where((raw[:, 0] == ord('C')) & (raw[:, 2] == 0), OC_CODES[raw[:, 1]], -1)
+    known = oc_codes >= 0
+    report['unknown_oc'] += int((~known).sum())
+    cells, reserves, oc_codes = cells[known], reserves[known], oc_codes[known]
+    filled = cells != 0
+
+    _count_groups(report['by_marbles'], filled.sum(axis=1), oc_codes)
+    _count_groups(report['by_reserve_diff'], reserves[:, 0] - reserves[:, 1], oc_codes)
+    occupancy = np.stack([filled[:, sl].sum(axis=1) for sl in LAYER_SLICES], axis=1)
+    _count_groups(report['by_layer_occupancy'], occupancy @ occupancy_weights, oc_codes)
+
+    # Stabilizer size under the 8 rotations/mirrors; a position is symmetric if it exceeds 1
+    stabilizer = 1 + sum([(cells[:, perm] == cells).all(axis=1) for perm in SYMMETRIES])
+    for oc_code, nn in enumerate(np.bincount(oc_codes[stabilizer > 1], minlength=len(OCS)).tolist()):
+      report['symmetric'][OCS[oc_code]] += nn
+    report['symmetry_classes'] += float((stabilizer / 8).sum())
+    for oc_code, nn in enumerate(np.bincount(oc_codes, minlength=len(OCS)).tolist()):
+      report['total'][OCS[oc_code]] += nn
+
+  # Decode the mixed-radix layer occupancy back to per-layer tuples (top layer first)
+  by_layer_occupancy = {}
+  for code, counter in report['by_layer_occupancy'].items():
+    occupancy = []
+    for radix in occupancy_radix.tolist():
+      occupancy.append(code % radix)
+      code //= radix
+    by_layer_occupancy[tuple(occupancy)] = counter
+  report['by_layer_occupancy'] = by_layer_occupancy
+  report['by_marbles'] = dict(report['by_marbles'])
+  report['by_reserve_diff'] = dict(report['by_reserve_diff'])
+  report['symmetry_classes'] = round(report['symmetry_classes'])
+  return report
+
+
+def format_report(report):
+  """Return the report as a text table"""
+  def row(label, counter):
+    return f"{label:>16} " + " ".join([f"{counter.get(oc, 0):>10}" for oc in OCS]) + \
+      f" {sum(counter.values()):>10}\n"
+
+  header = f"{'':>16} " + " ".join([f"{oc:>10}" for oc in OCS]) + f" {'total':>10}\n"
+  display = "TOTAL\n" + header + row("all", report['total'])
+  display += row("symmetric", report['symmetric'])
+  display += f"Symmetry classes: {report['symmetry_classes']}\n"
+  display += f"Skipped keys of another board size: {report['skipped']}\n"
+  display += f"Skipped unknown outcome classes: {report['unknown_oc']}\n"
+  display += "\nBY MARBLES ON BOARD\n" + header
+  for group in sorted(report['by_marbles']):
+    display += row(group, report['by_marbles'][group])
+  display += "\nBY RESERVE DIFFERENCE (blue - red)\n" + header
+  for group in sorted(report['by_reserve_diff']):
+    display += row(group, report['by_reserve_diff'][group])
+  display += "\nBY LAYER OCCUPANCY (top layer first)\n" + header
+  for group in sorted(report['by_layer_occupancy']):
+    display += row("-".join(map(str, group)), report['by_layer_occupancy'][group])
+  return display
+
+
+if __name__ == "__main__":
+  path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OC_PATH
+  chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1 << 22
+  print(format_report(analyze(path, chunk_size)))
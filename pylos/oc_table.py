@@ -0,0 +1,76 @@
+"""Lazily loaded outcome class table backed by a JSON file"""
+import os
+import json
+
+
+DEFAULT_OC_PATH = os.environ.get(
+  'PYLOS_OC_DICT',
+  os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'oc_dict.json')
+)
+
+
+class OCTable(object):
+
+  def __init__(self, path=DEFAULT_OC_PATH, create=False):
+    """Create a table bound to path.  The file is not read until the first lookup.
+    A missing file raises FileNotFoundError unless create is set, which starts an empty table"""
+    self.path = path
+    self.create = create
+    self._data = None
+
+
+  def load(self):
+    """Read the table from disk if it has not been read yet"""
+    if self._data is None:
+      if self.create and not os.path.exists(self.path):
+        self._data = {}
+      else:
+        with open(self.path) as f:
+          self._data = json.load(f)
+    return self._data
+
+
+  def set_path(self, path, create=False):
+    """Point the table to another file.  Entries loaded from the previous file are dropped"""
+    self.path = path
+    self.create = create
+    self._data = None
+
+
+  def save(self, path=None):
+    """Write the table to path (defaults to the path it was loaded from)"""
+    with open(path or self.path, 'w') as f:
+      f.write(json.dumps(self.load()))
+
+
+  def get(self, key, default=None):
+    return self.load().get(key, default)
+
+
+  def __contains__(self, key):
+    return key in self.load()
+
+
+  def __getitem__(self, key):
+    return self.load()[key]
+
+
+  def __setitem__(self, key, value):
+    self.load()[key] = value
+
+
+  def __len__(self):
+    return len(self.load())
+
+
+oc_dict = OCTable()
+
+
+def set_oc_path(path=DEFAULT_OC_PATH, create=False):
+  """Point the shared outcome table to another file.  Set create to start an empty table
+  when the file does not exist yet"""
+  oc_dict.set_path(path, create)
+
+
+def save_oc_dict():
+  oc_dict.save()
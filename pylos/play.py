@@ -0,0 +1,81 @@
+"""Move selection and principal lines read from the solved outcome table"""
+from pylos.oc_table import oc_dict
+from pylos.state import B, R, E, CP, CN, CR, CL
+
+
+# Preference of child outcome classes for the player who just moved into the child.
+# The first two win for that player; the rest lose against perfect play.
+OC_RANK = {
+  B: {CL: 0, CP: 1, CN: 2, CR: 3},
+  R: {CR: 0, CP: 1, CN: 2, CL: 3},
+}
+
+
+def other(color):
+  """Return the opponent of color"""
+  return R if color == B else B
+
+
+def is_win(oc, color):
+  """Return whether a child with outcome class oc is won by color, who just moved into it"""
+  return OC_RANK[color][oc] < 2
+
+
+def is_terminal(state):
+  """Return whether the solver treats state as finished (top filled or a color out of marbles)"""
+  return state.board[0][0][0] != E or state.get_count(B) == 0 or state.get_count(R) == 0
+
+
+def lookup_oc(state):
+  """Return the stored outcome class of state, or None if it has not been solved"""
+  return oc_dict.get(state.key)
+
+
+def get_ranked_moves(state, color):
+  """Return (child, oc) pairs for every solved child of color, best first.
+  Ties are broken by the child key so the order is deterministic.
+  The solver stops at the first winning child it finds, so unsolved children are skipped;
+  they can only be missing when a solved winning child exists"""
+  if lookup_oc(state) is None:
+    raise Exception(f"State {state.key} is not in the outcome table.")
+  rank = OC_RANK[color]
+  moves = []
+  for child in state.get_all_children(color):
+    oc = lookup_oc(child)
+    if oc is not None:
+      moves.append((child, oc))
+  moves.sort(key=lambda move: (rank[move[1]], move[0].key))
+  return moves
+
+
+def get_best_moves(state, color):
+  """Return the best children of color in get_ranked_moves order.  Empty if the game is over.
+  If color can win, this is every winning child (CL and CP for Blue, CR and CP for Red, own class
+  first); otherwise it is every child of the best losing class"""
+  if is_terminal(state):
+    return []
+  moves = get_ranked_moves(state, color)
+  if not moves:
+    return []
+  if is_win(moves[0][1], color):
+    return [child for child, oc in moves if is_win(oc, color)]
+  best_rank = OC_RANK[color][moves[0][1]]
+  return [child for child, oc in moves if OC_RANK[color][oc] == best_rank]
+
+
+def get_best_move(state, color):
+  """Return the preferred child of color, or None if the game is over"""
+  best_moves = get_best_moves(state, color)
+  return best_moves[0] if best_moves else None
+
+
+def get_principal_line(state, color):
+  """Return the (color to move, state) pairs from state to the end of the game,
+  both sides always choosing get_best_move.  The first entry is the starting position"""
+  line = [(color, state)]
+  while True:
+    child = get_best_move(state, color)
+    if child is None:
+      return line
+    state, color = child, other(color)
+    line.append((color, state))
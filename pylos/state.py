@@ -0,0 +1,345 @@
+"""Pylos board state, move generation and outcome class solver"""
+import math
+
+from pylos.oc_table import oc_dict
+
+
+N = 3
+COUNT = math.ceil(sum([ii*ii for ii in range(1, N+1)])/2) # total count of red (or blue) marbles 
+B, R, E = "B", "R", "E" # aliases of colors
+CP, CN, CR, CL =  "CP", "CN", "CR", "CL" # alias of outcome classes
+
+
+oc_counter = 0
+
+
+class State(object):
+
+  def __init__(self, board=None, reserves=None):
+    """Create a new state and board.  If no board is supplied as argument, create an empty board.
+    reserves maps each color to its remaining marble count; by default it is derived from COUNT"""
+
+    # Create self.board as a nested dict
+    if board is None:
+      self.board = {}
+      for layer in range(N):
+        self.board[layer] = {} 
+        for row in range(layer+1):
+          self.board[layer][row] = {}
+          for col in range(layer+1):
+            self.board[layer][row][col] = E 
+    else:
+      if len(board) != N:
+        raise Exception('Failed to create new board')
+      self.board = board
+     
+    # Derive other attributes from self.board
+    self.uid = self.encode()
+    if reserves is None:
+      reserves = {B: COUNT - self.uid.count(B), R: COUNT - self.uid.count(R)}
+    self.reserves = reserves
+    self.key = self.encode_key()
+
+
+  def encode(self):
+    """Encode the board into a string"""
+    uid = ""
+    for layer in range(N):
+      for row in range(layer+1):
+        for col in range(layer+1):
+          uid += self.board[layer][row][col]
+      uid += "-" 
+    return uid.rstrip('-')
+
+
+  def encode_key(self):
+    """Encode the board and reserves into the key used by oc_dict.
+    Each reserve is clamped to the number of empty cells: the top cell is filled last, so a color
+    holding at least that many marbles can never run out and the game tree is the same.
+    Configurations share keys only once a reserve reaches the empty-cell count, which needs
+    blue + red >= the number of cells; smaller configurations never meet.
+    Reserves matching the default COUNT keep the plain uid so existing tables stay valid"""
+    empty = self.uid.count(E)
+    blue = min(self.reserves[B], empty)
+    red = min(self.reserves[R], empty)
+    if (blue == min(COUNT - self.uid.count(B), empty) and
+        red == min(COUNT - self.uid.count(R), empty)):
+      return self.uid
+    return f"{self.uid}:{blue}:{red}"
+
+
+  def copy_board(self):
+    """Return a copy of self.board.  Cells hold strings, so copying the nested dicts is enough"""
+    return {layer: {row: dict(cols) for row, cols in rows.items()} for layer, rows in self.board.items()}
+
+
+  def get_count(self, color):
+    """Return reserve of a color"""
+    return self.reserves[color]
+
+
+  def print(self):
+    display = f"STATE: {self.uid}\n"
+    display += f'Blue: {self.get_count(B)}  Red: {self.get_count(R)}  '
+    display += f'OC(disk): {oc_dict.get(self.key,"??")}'
+    display += '\n'
+    for layer in range(N):
+      for row in range(layer+1):
+        for col in range(layer+1):
+          val = self.board[layer][row][col]
+          display += f"({val})" 
+        display += "\n"
+    print(display)
+
+
+
+  def play_add(self, color, layer, row, col):
+    """Simulate an ADD action.  Return new State"""
+    if not self.check_availability_to_add(layer, row, col):
+      raise Exception("Not available to add.")
+    if self.get_count(color) <= 0:
+      raise Exception(f"{color} is out of marbles.")
+
+    new_board = self.copy_board()
+    new_board[layer][row][col] = color
+    new_reserves = dict(self.reserves)
+    new_reserves[color] -= 1
+    return State(new_board, new_reserves)
+
+
+  def play_jump(self, color, from_layer, from_row, from_col, to_layer, to_row, to_col):
+    """Simulate an JUMP action.  Return new State"""
+    if color != self.board[from_layer][from_row][from_col]:
+      raise Exception(f"Piece to jump must be {color}.")
+    if not self.check_availability_to_jump_here(from_layer, from_row, from_col, to_layer, to_row, to_col):
+      raise Exception("Piece to jump is unavailable.")    
+    if (to_layer > from_layer):
+      raise Exception("Jump must be to a higher level.")
+    
+    new_board = self.copy_board()
+    new_board[to_layer][to_row][to_col] = color
+    new_board[from_layer][from_row][from_col] = E
+    return State(new_board, dict(self.reserves))
+
+
+  def check_availability_to_add(self, layer, row, col):
+    if layer < N-1 and layer > -1: 
+      if row <= layer and row > -1 and col <= layer and col > -1:
+        out = (
+          (self.board[layer][row][col] == E) and 
+          (self.board[layer+1][row][col] != E) and 
+          (self.board[layer+1][row+1][col] != E) and 
+          (self.board[layer+1][row][col+1] != E) and 
+          (self.board[layer+1][row+1][col+1] != E)
+        )
+        return out
+      else:
+        raise Exception("Row or Column is out of bounds")
+    elif layer == N-1: 
+      if row <= layer and row > -1 and col <= layer and col > -1:        
+        return (self.board[layer][row][col] == E)
+      else:
+        raise Exception("Row or Column is out of bounds")
+    else:
+      raise Exception("Layer is out of bounds")
+     
+
+  def check_availability_to_jump(self, from_layer, from_row, from_col):
+    if from_layer == 0:
+      return self.board[from_layer][from_row][from_col] != E    
+    elif self.board[from_layer][from_row][from_col] == E:
+      return False
+    else:
+      for above_row, tmp in self.board[from_layer-1].items():
+        for above_col, val in tmp.items():
+          if (val != E):
+            if (
+              ((above_row == from_row) or (above_row + 1 == from_row)) and 
+              ((above_col == from_col) or (above_col + 1 == from_col))
+            ):
+              return False
+      return True
+
+
+  def check_availability_to_jump_here(self, from_layer, from_row, from_col, to_layer, to_row, to_col):
+    if ((to_row == from_row) or (to_row + 1 == from_row)) and ((to_col == from_col) or (to_col + 1 == from_col)):
+      return False
+    else:
+      return self.check_availability_to_jump(from_layer, from_row, from_col) and self.check_availability_to_add(to_layer, to_row, to_col)
+
+  
+  def get_children_add(self, color):
+    """Return a list of new child states by adding color"""
+    children = []
+    if self.get_count(color):
+      for layer in range(N):
+        for row in range(layer+1):
+          for col in range(layer+1):
+            if self.check_availability_to_add(layer, row, col):
+              child = self.play_add(color, layer, row, col)
+              children.append(child)
+    return children
+ 
+
+  def get_children_jump(self, color):
+    """Return a list of new child states by jumping played by a color"""
+    children = []
+    for from_layer in range(N):
+      for from_row in range(from_layer+1):
+        for from_col in range(from_layer+1):
+          if self.board[from_layer][from_row][from_col] == color:
+            for to_layer in range(from_layer):
+              for to_row in range(to_layer+1):
+                for to_col in range(to_layer+1):
+                  if self.check_availability_to_jump_here(from_layer, from_row, from_col, to_layer, to_row, to_col):
+                    child = self.play_jump(color, from_layer, from_row, from_col, to_layer, to_row, to_col)
+                    children.append(child)
+    return children
+
+
+  def get_all_children(self, color):
+    """Return all children for a color"""
+    jump_children = self.get_children_jump(color)
+    add_children = self.get_children_add(color)
+    return jump_children + add_children
+
+
+  def get_equivalence(self):
+    """Return 8 equivalent states from rotation/mirro that share the same outcome class"""
+
+    # Rotate 0, 90, 180, 270 and their mirrors
+    r0_board = self.copy_board()
+    r0m_board = self.copy_board()
+    r90_board = self.copy_board()
+    r90m_board = self.copy_board()
+    r180_board = self.copy_board()
+    r180m_board = self.copy_board()
+    r270_board = self.copy_board()
+    r270m_board = self.copy_board()
+    for layer in range(N):
+      for row in range(layer+1):
+        for col in range(layer+1):
+          val = self.board[layer][row][col]
+          r0_board[layer][row][col] = val
+          r0m_board[layer][col][row] = val
+          r90_board[layer][layer-row][col] = val
+          r90m_board[layer][col][layer-row] = val
+          r180_board[layer][layer-row][layer-col] = val
+          r180m_board[layer][layer-col][layer-row] = val
+          r270_board[layer][row][layer-col] = val
+          r270m_board[layer][layer-col][row] = val
+    r0_state = State(r0_board, dict(self.reserves))
+    r0m_state = State(r0m_board, dict(self.reserves))
+    r90_state = State(r90_board, dict(self.reserves))
+    r90m_state = State(r90m_board, dict(self.reserves))
+    r180_state = State(r180_board, dict(self.reserves))
+    r180m_state = State(r180m_board, dict(self.reserves))
+    r270_state = State(r270_board, dict(self.reserves))
+    r270m_state = State(r270m_board, dict(self.reserves))
+
+    # Return non-duplicates 
+    states = [r0_state, r0m_state, r90_state, r90m_state, r180_state, r180m_state, r270_state, r270m_state] 
+    out = {ss.uid: ss for ss in states}
+    return list(out.values())
+
+
+  def compute_oc(self):
+    """Compute outcome class of this state"""
+    global oc_counter
+
+    if self.key in oc_dict:
+      #print(f'Read existing OC: {self.key}')
+      return oc_dict[self.key]
+    else:
+      outcome = CP # default
+
+      if self.board[0][0][0] == E:
+        if self.get_count(B) == 0:
+          outcome = CR
+        elif self.get_count(R) == 0:
+          outcome = CL
+        else:
+          left_oc = self.check_for_CL(B) or self.check_for_CP(B)
+          right_oc = self.check_for_CR(R) or self.check_for_CP(R)
+          if left_oc and right_oc:
+            outcome = CN
+          if left_oc and not(right_oc):
+            outcome = CL
+          if not(left_oc) and right_oc:
+            outcome = CR
+
+      oc_counter += 1
+      print(f'Computed new OC: {self.key} (total: {oc_counter})')
+
+      # Add equivalent and flip entries to OCT_DICT
+      eq_states = self.get_equivalence()
+      flip_map = {"CL": "CR", "CR": "CL", "CP": "CP", "CN": "CN"}
+      for eq_state in eq_states:
+          oc_dict[eq_state.key] = outcome # save equivalent cases
+          flip_eq_state = eq_state.flip()
+          oc_dict[flip_eq_state.key] = flip_map[outcome] # save flip cases
+
+      return outcome
+  
+
+  def check_for_CL(self, color):
+    """Return whether any children of color are CL"""
+    children = self.get_all_children(color)
+    for child in children:
+      if child.compute_oc() == CL:
+        return True
+    return False
+
+
+  def check_for_CR(self, color):
+    """Return whether any children of color are CR"""
+    children = self.get_all_children(color)
+    for child in children:
+      if child.compute_oc() == CR:
+        return True
+    return False
+
+
+  def check_for_CP(self, color):
+    """Return whether any children of color are CP"""
+    children = self.get_all_children(color)
+    for child in children:
+      if child.compute_oc() == CP:
+        return True
+    return False
+
+
+  def flip(self):
+    """Return new state with symmetric board with B/R switched"""
+    flip_board = self.copy_board()
+    for layer in range(N):
+      for row in range(layer+1):
+        for col in range(layer+1):
+          if flip_board[layer][row][col] == B:
+            flip_board[layer][row][col] = R
+          elif flip_board[layer][row][col] == R:
+            flip_board[layer][row][col] = B
+    return State(flip_board, {B: self.reserves[R], R: self.reserves[B]})
+
+
+def get_reserve_configs(max_count=COUNT):
+  """Return the (blue, red) reserve configurations with 1..max_count marbles each.
+  Only blue >= red is listed; (red, blue) is its color mirror and is solved by the flip entries"""
+  return [(blue, red) for blue in range(1, max_count+1) for red in range(1, blue+1)]
+
+
+def sweep_reserves(configs=None):
+  """Solve the empty board for a family of (blue, red) reserve configurations in one run.
+  Reserves are clamped in the key (see State.encode_key), so configurations with blue + red at or
+  above the number of cells share their late-game oc_dict entries.  Below that, the only reuse is
+  the color mirror (red, blue), which the flip entries answer without search"""
+  if configs is None:
+    configs = get_reserve_configs()
+  results = {}
+  for blue, red in configs:
+    for reserves in [(blue, red), (red, blue)]:
+      if reserves not in results:
+        state = State(reserves={B: reserves[0], R: reserves[1]})
+        results[reserves] = state.compute_oc()
+        print(f'Reserves B={reserves[0]} R={reserves[1]}: {results[reserves]} (total computed: {oc_counter})')
+  return results